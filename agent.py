@@ -1,24 +1,75 @@
 import random
-from typing import List, Union, Optional
+from typing import Dict, Final, Sequence, Optional
+
+# 动作编码: 1=beat（背叛），0=still（合作）
+STILL: Final = 0
+BEAT: Final = 1
+ACTION_NAMES: Final = ("still", "beat")  # 动作编码到名称的映射，仅用于日志等展示场合
+
+# 位棋盘最多保留的回合数, 最低位为最近一回合
+HISTORY_BITS: Final = 64
+HISTORY_MASK: Final = (1 << HISTORY_BITS) - 1
+
+
+# 动作编码(0/1字节)到二进制数字字符的转换表
+_BIT_DIGITS: Final = bytes.maketrans(b"\x00\x01", b"01")
+_DIGIT_BITS: Final = bytes.maketrans(b"01", b"\x00\x01")
+
+# 随机函数的模块级绑定，省去决策热路径上的全局与属性查找
+# （random.seed 重置的是同一个全局生成器，绑定后依然有效）
+_rand = random.random
+_getrandbits = random.getrandbits
+
+
+def pack_history(history: Sequence[int]) -> int:
+    """将动作历史压缩为位棋盘(最低位为最近一回合, 最多保留HISTORY_BITS回合)"""
+    digits = bytes(history[-HISTORY_BITS:]).translate(_BIT_DIGITS)
+    return int(digits, 2) if digits else 0
+
+
+def action_name(action: int) -> str:
+    """将动作编码转换为 'beat' 或 'still'"""
+    return ACTION_NAMES[action]
+
 
 class Agent:
     """
     智能体基类，所有策略必须继承此类并实现decide方法
     """
+    __slots__ = ("name",)
+    
+    # 动作与对手无关的智能体可将其设为方法 precompute_actions(rounds) -> bytes，
+    # 一次性生成整场对抗的动作序列（BEAT=1，STILL=0）；双方都提供时Match将跳过逐回合决策。
+    # 子类自行实现decide或decide_bits而未同时声明该方法时，不会沿用父类的预生成序列
+    precompute_actions = None
+    
+    # 决策完全由历史和reset后的状态决定（不使用随机数）的智能体设为True；
+    # 双方都为True时各场对抗结果必然相同，Match只需实际运行一场。
+    # 该标志不会被子类继承，每个类需要自行声明
+    deterministic = False
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "deterministic" not in cls.__dict__:
+            cls.deterministic = False
+        if "precompute_actions" not in cls.__dict__ \
+                and ("decide" in cls.__dict__ or "decide_bits" in cls.__dict__):
+            cls.precompute_actions = None
+    
     def __init__(self, name: Optional[str] = None):
         """初始化智能体"""
         self.name = name if name else self.__class__.__name__
     
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
+    def decide(self, history_self: Sequence[int], history_opponent: Sequence[int]) -> int:
         """
         根据历史决策下一步行动
         
         参数:
-            history_self: 自己的历史动作列表
-            history_opponent: 对手的历史动作列表
+            history_self: 自己的历史动作序列（BEAT=1，STILL=0，对抗中为bytearray）
+            history_opponent: 对手的历史动作序列
             
         返回:
-            'beat' 或 'still'
+            BEAT 或 STILL
         """
         raise NotImplementedError("必须在子类中实现decide方法")
     
@@ -30,73 +81,139 @@ class Agent:
         return self.name
 
 
-class TitForTatAgent(Agent):
+class BitboardAgent(Agent):
+    """
+    基于位棋盘决策的智能体基类，子类实现decide_bits方法
+    
+    对抗时由Match直接维护双方的位棋盘并调用decide_bits，
+    decide仅作为历史序列接口的兼容层保留
+    """
+    __slots__ = ()
+    
+    def decide_bits(self, hs: int, ho: int, n: int) -> int:
+        """
+        根据位棋盘决策下一步行动
+        
+        参数:
+            hs: 自己的历史位棋盘（最低位为最近一回合，1=beat，0=still）
+            ho: 对手的历史位棋盘
+            n: 已进行的回合数
+            
+        返回:
+            BEAT 或 STILL
+        """
+        raise NotImplementedError("必须在子类中实现decide_bits方法")
+    
+    def decide(self, history_self: Sequence[int], history_opponent: Sequence[int]) -> int:
+        return self.decide_bits(pack_history(history_self),
+                                pack_history(history_opponent),
+                                len(history_opponent))
+
+
+class TitForTatAgent(BitboardAgent):
     """以牙还牙策略: 第一回合选择still, 之后模仿对手上一回合的选择"""
     
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
-        if not history_opponent:  # 第一回合
-            return "still"
-        return history_opponent[-1]  # 复制对手上一回合的选择
+    deterministic = True
+    
+    __slots__ = ()
+    
+    def decide_bits(self, hs: int, ho: int, n: int) -> int:
+        return ho & 1  # 复制对手上一回合的选择（第一回合位棋盘为0，即still）
 
 
-class AlwaysBeatAgent(Agent):
+class AlwaysBeatAgent(BitboardAgent):
     """始终选择beat的策略"""
     
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
-        return "beat"
+    deterministic = True
+    
+    __slots__ = ()
+    
+    def decide_bits(self, hs: int, ho: int, n: int) -> int:
+        return BEAT
+    
+    def precompute_actions(self, rounds: int) -> bytes:
+        return bytes((BEAT,)) * rounds
 
 
-class AlwaysStillAgent(Agent):
+class AlwaysStillAgent(BitboardAgent):
     """始终选择still的策略"""
     
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
-        return "still"
+    deterministic = True
+    
+    __slots__ = ()
+    
+    def decide_bits(self, hs: int, ho: int, n: int) -> int:
+        return STILL
+    
+    def precompute_actions(self, rounds: int) -> bytes:
+        return bytes((STILL,)) * rounds
 
 
-class RandomAgent(Agent):
+class RandomAgent(BitboardAgent):
     """随机策略"""
     
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
-        return random.choice(["beat", "still"])
+    __slots__ = ()
+    
+    def decide_bits(self, hs: int, ho: int, n: int) -> int:
+        # 直接抽取一个随机位作为动作（1=beat，0=still）
+        return _getrandbits(1)
+    
+    def decide(self, history_self: Sequence[int], history_opponent: Sequence[int]) -> int:
+        # 与历史无关，无需经由兼容层打包位棋盘
+        return _getrandbits(1)
+    
+    def precompute_actions(self, rounds: int) -> bytes:
+        # 一次抽取rounds个随机位，逐位展开为动作序列
+        if not rounds:
+            return b""
+        return format(_getrandbits(rounds), f"0{rounds}b").encode().translate(_DIGIT_BITS)
 
 
-class ForgivingTitForTatAgent(Agent):
+class ForgivingTitForTatAgent(BitboardAgent):
     """宽容的以牙还牙: 只有当对手在最近3轮中有至少2次beat才会选择beat"""
     
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
-        if len(history_opponent) < 3:
-            return "still"
+    deterministic = True
+    
+    __slots__ = ()
+    
+    # 对手最近三轮的位棋盘(ho & 0b111) -> 决策
+    _DECISIONS = tuple(BEAT if recent.bit_count() >= 2 else STILL for recent in range(8))
+    
+    def decide_bits(self, hs: int, ho: int, n: int) -> int:
+        if n < 3:
+            return STILL
         
         # 检查最近三轮
-        if history_opponent[-3:].count("beat") >= 2:
-            return "beat"
-        else:
-            return "still"
+        return self._DECISIONS[ho & 0b111]
 
 
-class GradualAgent(Agent):
+class GradualAgent(BitboardAgent):
     """渐进式报复: 探测对手背叛倾向并做出相应的报复"""
     
+    deterministic = True
+    
+    __slots__ = ("revenge_counter", "defect_count")
+    
     def __init__(self, name: Optional[str] = None):
         super().__init__(name)
         self.revenge_counter = 0  # 报复计数器
         self.defect_count = 0    # 对手背叛次数
     
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
-        if not history_opponent:
-            return "still"
+    def decide_bits(self, hs: int, ho: int, n: int) -> int:
+        if not n:
+            return STILL
             
         # 检查对手是否在上一轮背叛
-        if history_opponent[-1] == "beat" and history_self[-1] == "still":
+        if ho & 1 and not hs & 1:
             self.defect_count += 1
             self.revenge_counter = self.defect_count  # 设置报复次数与背叛总次数相等
         
         # 如果在报复模式中，继续背叛
         if self.revenge_counter > 0:
             self.revenge_counter -= 1
-            return "beat"
+            return BEAT
         
-        return "still"
+        return STILL
     
     def reset(self):
         """重置报复状态"""
@@ -107,52 +224,80 @@ class GradualAgent(Agent):
 class PatternDetectorAgent(Agent):
     """模式检测智能体: 尝试检测对手的行为模式"""
     
+    deterministic = True
+    
+    __slots__ = ("pattern_length", "_rolling", "_seen", "_first_beat_pos")
+    
     def __init__(self, name: Optional[str] = None):
         super().__init__(name)
         self.pattern_length = 3  # 尝试识别的模式长度
+        # 模式编码 -> 该模式之后对手选择beat的最早起始位置
+        self._first_beat_pos: Dict[int, int] = {}
+        self._rolling = 0  # 对手最近pattern_length个动作的编码（1=beat）
+        self._seen = 0     # 已编入索引的对手历史长度
     
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
-        if len(history_opponent) < self.pattern_length + 1:
-            return "still"  # 开始时合作
-        
-        # 尝试检测对手最近行为是否有可识别模式
-        recent_pattern = history_opponent[-self.pattern_length:]
-        
-        # 查找历史中类似的模式
-        for i in range(len(history_opponent) - self.pattern_length * 2):
-            if history_opponent[i:i+self.pattern_length] == recent_pattern:
-                # 如果找到相同模式，预测下一步
-                prediction = history_opponent[i+self.pattern_length]
-                # 如果预测对手会背叛，提前背叛
-                if prediction == "beat":
-                    return "beat"
+    def decide(self, history_self: Sequence[int], history_opponent: Sequence[int]) -> int:
+        k = self.pattern_length
+        mask = (1 << k) - 1
+        # 只处理新增的对手动作，记录每个长度为k的窗口之后的动作
+        while self._seen < len(history_opponent):
+            bit = history_opponent[self._seen]
+            if bit and self._seen >= k:
+                self._first_beat_pos.setdefault(self._rolling, self._seen - k)
+            self._rolling = ((self._rolling << 1) | bit) & mask
+            self._seen += 1
+        
+        if len(history_opponent) < k + 1:
+            return STILL  # 开始时合作
+        
+        # 查找历史中与最近行为相同、且之后对手背叛的模式
+        pos = self._first_beat_pos.get(self._rolling)
+        if pos is not None and pos < len(history_opponent) - k * 2:
+            # 如果预测对手会背叛，提前背叛
+            return BEAT
         
         # 默认为合作
-        return "still"
+        return STILL
+    
+    def reset(self):
+        """重置模式索引"""
+        self._first_beat_pos = {}
+        self._rolling = 0
+        self._seen = 0
 
 
 class AdaptiveAgent(Agent):
     """自适应智能体: 根据对手过去行为调整策略"""
     
+    deterministic = True
+    
+    __slots__ = ("cooperation_rate", "total_rounds", "_still_count", "_seen")
+    
     def __init__(self, name: Optional[str] = None):
         super().__init__(name)
         self.cooperation_rate = 0.0  # 对手合作率
         self.total_rounds = 0
+        self._still_count = 0  # 对手累计合作次数
+        self._seen = 0         # 已统计的对手历史长度
     
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
+    def decide(self, history_self: Sequence[int], history_opponent: Sequence[int]) -> int:
+        # 只统计上次调用后新增的对手动作
+        while self._seen < len(history_opponent):
+            self._still_count += history_opponent[self._seen] == STILL
+            self._seen += 1
+        
         if not history_opponent:
-            return "still"
+            return STILL
         
         # 统计对手合作率
-        still_count = history_opponent.count("still")
         self.total_rounds = len(history_opponent)
-        self.cooperation_rate = still_count / self.total_rounds if self.total_rounds > 0 else 0
+        self.cooperation_rate = self._still_count / self.total_rounds if self.total_rounds > 0 else 0
         
         # 根据对手的合作倾向决定策略
         if self.cooperation_rate >= 0.7:  # 对手很合作
-            return "still"  # 我们也合作
+            return STILL  # 我们也合作
         elif self.cooperation_rate <= 0.3:  # 对手不太合作
-            return "beat"   # 我们也背叛
+            return BEAT   # 我们也背叛
         else:  # 对手行为不确定
             # 使用TitForTat策略
             return history_opponent[-1]
@@ -161,132 +306,151 @@ class AdaptiveAgent(Agent):
         """重置统计数据"""
         self.cooperation_rate = 0.0
         self.total_rounds = 0
+        self._still_count = 0
+        self._seen = 0
 
 
-class TwoCoopOneDefectAgent(Agent):
+class TwoCoopOneDefectAgent(BitboardAgent):
     """两报一背叛策略: 智能体首先合作两次，然后背叛一次，循环往复"""
     
+    deterministic = True
+    
+    __slots__ = ("counter",)
+    
     def __init__(self, name: Optional[str] = None):
         super().__init__(name)
         self.counter = 0  # 用于追踪循环位置
         
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
+    def decide_bits(self, hs: int, ho: int, n: int) -> int:
         # 更新计数器
         self.counter = (self.counter + 1) % 3
         
         # 前两步合作，第三步背叛
         if self.counter < 2:
-            return "still"
+            return STILL
         else:
-            return "beat"
+            return BEAT
+    
+    def precompute_actions(self, rounds: int) -> bytes:
+        # 动作只取决于回合序号: 计数器依次为1、2、0，对应 still、beat、still
+        return (bytes((STILL, BEAT, STILL)) * (rounds // 3 + 1))[:rounds]
     
     def reset(self):
         """重置计数器"""
         self.counter = 0
 
 
-class RewardPunishmentAgent(Agent):
+class RewardPunishmentAgent(BitboardAgent):
     """助长惩罚策略: 对合作行为奖励，对背叛行为惩罚"""
     
+    deterministic = True
+    
+    # 以对方上一次行为为下标的惩罚计数转移表:
+    #   对方合作 -> 减少惩罚计数;  对方背叛 -> 增加惩罚计数，但有上限5
+    _NEXT_COUNTER = (
+        tuple(max(0, c - 1) for c in range(6)),
+        tuple(min(5, c + 2) for c in range(6))
+    )
+    
+    __slots__ = ("punishment_counter",)
+    
     def __init__(self, name: Optional[str] = None):
         super().__init__(name)
         self.punishment_counter = 0  # 惩罚计数器
         
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
-        if not history_opponent:
-            return "still"  # 首轮默认合作
+    def decide_bits(self, hs: int, ho: int, n: int) -> int:
+        if not n:
+            return STILL  # 首轮默认合作
         
         # 根据对方上一次行为决定
-        if history_opponent[-1] == "still":
-            # 对方合作，我们也合作，奖励合作行为
-            self.punishment_counter = max(0, self.punishment_counter - 1)  # 减少惩罚计数
-            return "still"
-        else:
-            # 对方背叛，我们进行连续惩罚
-            self.punishment_counter = min(5, self.punishment_counter + 2)  # 增加惩罚计数，但有上限
-            
-            # 如果惩罚计数器大于0，执行惩罚
-            if self.punishment_counter > 0:
-                return "beat"
-            return "still"
+        last = ho & 1
+        self.punishment_counter = self._NEXT_COUNTER[last][self.punishment_counter]
+        # 对方合作时我们也合作以奖励合作；对方背叛后惩罚计数必大于0，执行惩罚
+        return last
     
     def reset(self):
         """重置惩罚计数器"""
         self.punishment_counter = 0
 
 
-class EscapeTigerAgent(Agent):
+def _build_escape_tiger_table() -> bytes:
+    """
+    预先计算虎口脱险策略的状态转移表
+    
+    索引: (试探模式<<3) | (利用模式<<2) | (对手上一轮beat<<1) | (连续合作>=5)
+    取值: 动作 | (下一试探模式<<1) | (下一利用模式<<2) | (清零合作计数<<3)
+    """
+    table = bytearray(16)
+    for key in range(16):
+        test_mode, exploit_mode = key >> 3 & 1, key >> 2 & 1
+        opp_beat, streak_full = key >> 1 & 1, key & 1
+        if test_mode or exploit_mode:
+            # 试探后或利用中: 对方未惩罚则继续背叛（进入/保持利用模式），否则恢复合作
+            exploit_mode = 1 - opp_beat
+            table[key] = (BEAT if exploit_mode else STILL) | (exploit_mode << 2)
+        elif streak_full:
+            # 连续合作达到阈值，进行试探性背叛
+            table[key] = BEAT | (1 << 1) | (1 << 3)
+        else:
+            table[key] = STILL
+    return bytes(table)
+
+
+class EscapeTigerAgent(BitboardAgent):
     """虎口脱险策略: 在连续合作后突然背叛一次，观察对方反应"""
     
+    deterministic = True
+    
+    _TABLE = _build_escape_tiger_table()
+    
+    __slots__ = ("coop_streak", "test_mode", "exploit_mode")
+    
     def __init__(self, name: Optional[str] = None):
         super().__init__(name)
         self.coop_streak = 0  # 连续合作计数
-        self.test_mode = False  # 是否处于试探模式
-        self.exploit_mode = False  # 是否处于利用模式
+        self.test_mode = 0  # 是否处于试探模式
+        self.exploit_mode = 0  # 是否处于利用模式
         
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
-        if not history_opponent:
-            return "still"  # 首轮默认合作
+    def decide_bits(self, hs: int, ho: int, n: int) -> int:
+        if n == 0:
+            return STILL  # 首轮默认合作
         
         # 如果上一轮双方都合作，增加合作计数
-        if history_self and history_self[-1] == "still" and history_opponent[-1] == "still":
-            self.coop_streak += 1
-        else:
+        if (hs | ho) & 1:
             self.coop_streak = 0
-            
-        # 如果在试探模式中
-        if self.test_mode:
-            self.test_mode = False
-            # 检查对方对我们的试探背叛的反应
-            if history_opponent[-1] == "still":
-                # 对方没有惩罚我们的背叛，进入利用模式
-                self.exploit_mode = True
-                return "beat"
-            else:
-                # 对方惩罚了我们，恢复合作
-                self.exploit_mode = False
-                return "still"
-        
-        # 如果在利用模式中，继续背叛
-        if self.exploit_mode:
-            # 检查对方是否开始惩罚我们
-            if history_opponent[-1] == "beat":
-                # 对方开始惩罚，退出利用模式
-                self.exploit_mode = False
-                return "still"
-            else:
-                # 继续利用
-                return "beat"
+        else:
+            self.coop_streak += 1
         
-        # 如果连续合作达到阈值，进入试探模式
-        if self.coop_streak >= 5:
-            self.test_mode = True
+        packed = self._TABLE[(self.test_mode << 3) | (self.exploit_mode << 2)
+                             | ((ho & 1) << 1) | (self.coop_streak >= 5)]
+        self.test_mode = (packed >> 1) & 1
+        self.exploit_mode = (packed >> 2) & 1
+        if packed & 8:
             self.coop_streak = 0
-            return "beat"  # 进行试探性背叛
-        
-        # 正常情况下保持合作
-        return "still"
+        return packed & 1
     
     def reset(self):
         """重置状态"""
         self.coop_streak = 0
-        self.test_mode = False
-        self.exploit_mode = False
+        self.test_mode = 0
+        self.exploit_mode = 0
 
 
 class InchingAgent(Agent):
     """得寸进尺策略: 在对方合作时逐渐增加背叛，在对方背叛时减少背叛"""
     
+    __slots__ = ("defect_rate",)
+    
     def __init__(self, name: Optional[str] = None):
         super().__init__(name)
         self.defect_rate = 0.0  # 背叛概率
         
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
+    def decide(self, history_self: Sequence[int], history_opponent: Sequence[int]) -> int:
         if not history_opponent:
-            return "still"  # 首轮默认合作
+            return STILL  # 首轮默认合作
             
         # 根据对方上一轮行为调整背叛概率
-        if history_opponent[-1] == "still":
+        if history_opponent[-1] == STILL:
             # 对方合作，我们增加一点背叛概率
             self.defect_rate = min(0.7, self.defect_rate + 0.05)
         else:
@@ -294,9 +458,9 @@ class InchingAgent(Agent):
             self.defect_rate = max(0.0, self.defect_rate - 0.2)
         
         # 按背叛概率决定行动
-        if random.random() < self.defect_rate:
-            return "beat"
-        return "still"
+        if _rand() < self.defect_rate:
+            return BEAT
+        return STILL
     
     def reset(self):
         """重置背叛概率"""
@@ -306,18 +470,20 @@ class InchingAgent(Agent):
 class TrustBuildingAgent(Agent):
     """信任建立策略: 初始保持合作建立信任，识别并惩罚背叛"""
     
+    __slots__ = ("trust_level", "forgiveness")
+    
     def __init__(self, name: Optional[str] = None):
         super().__init__(name)
         self.trust_level = 1.0  # 信任级别，初始为完全信任
         self.forgiveness = 0.1  # 宽恕速率
         
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
+    def decide(self, history_self: Sequence[int], history_opponent: Sequence[int]) -> int:
         # 前3轮强制合作，建立信任关系
         if len(history_opponent) < 3:
-            return "still"
+            return STILL
             
         # 根据对方行为更新信任度
-        if history_opponent and history_opponent[-1] == "beat":
+        if history_opponent and history_opponent[-1] == BEAT:
             # 对方背叛，大幅降低信任度
             self.trust_level = max(0.0, self.trust_level - 0.3)
         else:
@@ -325,67 +491,78 @@ class TrustBuildingAgent(Agent):
             self.trust_level = min(1.0, self.trust_level + self.forgiveness)
         
         # 根据信任度决定是否合作
-        if random.random() < self.trust_level:
-            return "still"  # 信任时合作
+        if _rand() < self.trust_level:
+            return STILL  # 信任时合作
         else:
-            return "beat"   # 不信任时背叛
+            return BEAT   # 不信任时背叛
     
     def reset(self):
         """重置信任度"""
         self.trust_level = 1.0
 
 
-class GrudgeAgent(Agent):
+class GrudgeAgent(BitboardAgent):
     """记仇策略: 以合作开始, 如果对手有过beat则一直beat"""
     
+    deterministic = True
+    
+    __slots__ = ("grudge", "_seen")
+    
     def __init__(self, name: Optional[str] = None):
         super().__init__(name)
         self.grudge = False  # 是否记仇
+        self._seen = 0  # 兼容层已检查的对手历史长度
         
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
-        if not history_opponent:
-            return "still"  # 首轮默认合作
-            
-        # 检查对手是否有过背叛
-        if "beat" in history_opponent:
+    def decide_bits(self, hs: int, ho: int, n: int) -> int:
+        # 检查对手是否有过背叛（每回合都会观察到对手最新动作，记仇标志保证超出位棋盘的背叛不会被遗忘）
+        if ho:
             self.grudge = True
             
         # 如果记仇，则一直背叛
-        if self.grudge:
-            return "beat"
-            
-        return "still"
+        return BEAT if self.grudge else STILL
+    
+    def decide(self, history_self: Sequence[int], history_opponent: Sequence[int]) -> int:
+        # 直接检查完整历史中新增的部分，不受位棋盘只保留最近HISTORY_BITS回合的限制
+        if not self.grudge and BEAT in history_opponent[self._seen:]:
+            self.grudge = True
+        self._seen = len(history_opponent)
+        return BEAT if self.grudge else STILL
     
     def reset(self):
         """重置记仇状态"""
         self.grudge = False
+        self._seen = 0
 
 
-class PunishmentEscalationAgent(Agent):
+class PunishmentEscalationAgent(BitboardAgent):
     """惩罚策略: 以still开始, 以以牙还牙为模版, 但会随着对手beat次数增加惩罚力度"""
     
+    deterministic = True
+    
+    __slots__ = ("opponent_defect_count", "punishment_streak")
+    
     def __init__(self, name: Optional[str] = None):
         super().__init__(name)
         self.opponent_defect_count = 0  # 对手背叛计数
         self.punishment_streak = 0  # 当前连续惩罚次数
         
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
-        if not history_opponent:
-            return "still"  # 首轮默认合作
+    def decide_bits(self, hs: int, ho: int, n: int) -> int:
+        if not n:
+            return STILL  # 首轮默认合作
             
         # 如果处于惩罚模式，继续惩罚
         if self.punishment_streak > 0:
             self.punishment_streak -= 1
-            return "beat"
+            return BEAT
             
         # 如果对手上轮背叛，开始惩罚
-        if history_opponent[-1] == "beat":
+        if ho & 1:
             self.opponent_defect_count += 1
             # 惩罚次数与对手总背叛次数有关
             self.punishment_streak = min(5, self.opponent_defect_count // 2)
-            return "beat"
+            return BEAT
             
-        return "still"
+        return STILL
     
     def reset(self):
         """重置惩罚状态"""
@@ -393,36 +570,40 @@ class PunishmentEscalationAgent(Agent):
         self.punishment_streak = 0
 
 
-class ConsensusAgent(Agent):
+class ConsensusAgent(BitboardAgent):
     """共识策略: 上一步选择相同时合作, 上一步选择不同时2/7概率合作"""
     
+    __slots__ = ()
+    
     def __init__(self, name: Optional[str] = None):
         super().__init__(name)
         
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
-        if not history_self or not history_opponent:
-            return "still"  # 首轮默认合作
+    def decide_bits(self, hs: int, ho: int, n: int) -> int:
+        if not n:
+            return STILL  # 首轮默认合作
             
         # 检查上一轮双方是否选择相同
-        if history_self[-1] == history_opponent[-1]:
+        if not (hs ^ ho) & 1:
             # 选择相同，合作
-            return "still"
+            return STILL
         else:
             # 选择不同，2/7概率合作
-            return "still" if random.random() < 2/7 else "beat"
+            return STILL if _rand() < 2/7 else BEAT
 
 
 class ProbeAgent(Agent):
     """试探策略: 以以牙还牙开始, 但合作概率逐渐降低至0.5"""
     
+    __slots__ = ("cooperation_prob", "rounds")
+    
     def __init__(self, name: Optional[str] = None):
         super().__init__(name)
         self.cooperation_prob = 1.0  # 初始合作概率为100%
         self.rounds = 0
         
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
+    def decide(self, history_self: Sequence[int], history_opponent: Sequence[int]) -> int:
         if not history_opponent:
-            return "still"  # 首轮默认合作
+            return STILL  # 首轮默认合作
             
         self.rounds += 1
         
@@ -434,8 +615,8 @@ class ProbeAgent(Agent):
         tit_for_tat_action = history_opponent[-1]
         
         # 如果基础策略是合作，但按概率变为背叛
-        if tit_for_tat_action == "still" and random.random() > self.cooperation_prob:
-            return "beat"
+        if tit_for_tat_action == STILL and _rand() > self.cooperation_prob:
+            return BEAT
         
         return tit_for_tat_action
     
@@ -445,155 +626,163 @@ class ProbeAgent(Agent):
         self.rounds = 0
 
 
-class CappedAgent(Agent):
+class CappedAgent(BitboardAgent):
     """封顶策略: 对手合作时0.9概率合作, 对手beat时总是beat"""
     
+    __slots__ = ()
+    
     def __init__(self, name: Optional[str] = None):
         super().__init__(name)
         
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
-        if not history_opponent:
-            return "still"  # 首轮默认合作
+    def decide_bits(self, hs: int, ho: int, n: int) -> int:
+        if not n:
+            return STILL  # 首轮默认合作
             
         # 根据对手上一轮行为决定
-        if history_opponent[-1] == "still":
+        if not ho & 1:
             # 对手合作，90%概率合作
-            return "still" if random.random() < 0.9 else "beat"
+            return STILL if _rand() < 0.9 else BEAT
         else:
             # 对手背叛，必定背叛
-            return "beat"
+            return BEAT
 
 
-class ShortMemoryAgent(Agent):
-    """短期记忆: 根据前三次的合作次数决定合作概率(0.3-0.7)"""
+class MemoryAgent(BitboardAgent):
+    """记忆策略: 根据对手最近lookback次的合作比例决定合作概率(low-high)"""
     
-    def __init__(self, name: Optional[str] = None):
+    __slots__ = ("lookback", "low", "high", "min_history", "_span", "coop_prob", "_still_count", "_seen")
+    
+    def __init__(self, lookback: Optional[int], low: float, high: float,
+                 name: Optional[str] = None, min_history: int = 1, span: Optional[float] = None):
+        """
+        参数:
+            lookback: 回看的回合数，None表示全部历史
+            low: 对手从不合作时的合作概率
+            high: 对手总是合作时的合作概率
+            name: 智能体名称
+            min_history: 历史不足该回合数时由_warmup决策
+            span: 合作概率的变化幅度，默认为high - low（浮点减法可能有一个ULP的误差，需要精确值时直接传入）
+        """
         super().__init__(name)
+        if lookback is not None and lookback > HISTORY_BITS:
+            raise ValueError(f"lookback不能超过位棋盘长度{HISTORY_BITS}，需要回看全部历史时请使用None")
+        self.lookback = lookback
+        self.low = low
+        self.high = high
+        self.min_history = min_history
+        self._span = span if span is not None else high - low
         self.coop_prob = 0.7  # 初始合作概率
+        self._still_count = 0  # 对手累计合作次数（仅全部历史时使用，历史超出位棋盘长度，需逐回合累加）
+        self._seen = 0         # 已统计的对手回合数
+        
+    def decide_bits(self, hs: int, ho: int, n: int) -> int:
+        if self.lookback is None:
+            if n - self._seen > HISTORY_BITS:
+                raise ValueError("新增回合数超出位棋盘长度，请逐回合调用或使用decide")
+            # 只统计上次调用后新增的对手动作（第i回合位于位棋盘第n-1-i位）
+            while self._seen < n:
+                self._still_count += 1 - ((ho >> (n - 1 - self._seen)) & 1)
+                self._seen += 1
+        
+        if n < self.min_history:
+            return self._warmup(hs, ho, n)
+        
+        # 统计回看窗口内对手合作次数
+        if self.lookback is None:
+            window = n
+            coop_count = self._still_count
+        else:
+            window = min(self.lookback, n)
+            coop_count = window - (ho & ((1 << window) - 1)).bit_count()
         
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
-        if len(history_opponent) < 3:
-            return "still" if random.random() < self.coop_prob else "beat"
-            
-        # 统计前三次对手合作次数
-        recent_actions = history_opponent[-3:]
-        coop_count = recent_actions.count("still")
-        
-        # 根据合作次数调整概率，范围在0.3-0.7之间
-        self.coop_prob = 0.3 + (coop_count / 3) * 0.4
+        # 根据合作比例调整概率，范围在low-high之间
+        self.coop_prob = self.low + (coop_count / window) * self._span
         
         # 按概率决定是否合作
-        return "still" if random.random() < self.coop_prob else "beat"
+        return STILL if _rand() < self.coop_prob else BEAT
+    
+    def decide(self, history_self: Sequence[int], history_opponent: Sequence[int]) -> int:
+        if self.lookback is None:
+            # 直接按序列统计新增的对手合作次数，不受位棋盘只保留最近HISTORY_BITS回合的限制
+            if isinstance(history_opponent, (bytes, bytearray)):
+                self._still_count += history_opponent.count(STILL, self._seen)
+            else:
+                self._still_count += history_opponent[self._seen:].count(STILL)
+            self._seen = len(history_opponent)
+        return super().decide(history_self, history_opponent)
+    
+    def _warmup(self, hs: int, ho: int, n: int) -> int:
+        """历史不足时按初始合作概率决定"""
+        return STILL if _rand() < self.coop_prob else BEAT
     
     def reset(self):
         """重置合作概率"""
         self.coop_prob = 0.7
+        self._still_count = 0
+        self._seen = 0
 
 
-class MediumMemoryAgent(Agent):
-    """近期记忆: 根据前15次的合作次数决定合作概率(0.2-0.8)"""
+class ShortMemoryAgent(MemoryAgent):
+    """短期记忆: 根据前三次的合作次数决定合作概率(0.3-0.7)"""
+    
+    __slots__ = ()
     
     def __init__(self, name: Optional[str] = None):
-        super().__init__(name)
-        self.coop_prob = 0.7  # 初始合作概率
-        
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
-        if not history_opponent:
-            return "still" if random.random() < self.coop_prob else "beat"
-            
-        # 统计近期对手合作次数（最多15轮）
-        lookback = min(15, len(history_opponent))
-        recent_actions = history_opponent[-lookback:]
-        coop_count = recent_actions.count("still")
-        
-        # 根据合作次数调整概率，范围在0.2-0.8之间
-        self.coop_prob = 0.2 + (coop_count / lookback) * 0.6
-        
-        # 按概率决定是否合作
-        return "still" if random.random() < self.coop_prob else "beat"
+        super().__init__(3, 0.3, 0.7, name, min_history=3, span=0.4)
+
+
+class MediumMemoryAgent(MemoryAgent):
+    """近期记忆: 根据前15次的合作次数决定合作概率(0.2-0.8)"""
     
-    def reset(self):
-        """重置合作概率"""
-        self.coop_prob = 0.7
+    __slots__ = ()
+    
+    def __init__(self, name: Optional[str] = None):
+        super().__init__(15, 0.2, 0.8, name, span=0.6)
 
 
-class LongMemoryAgent(Agent):
+class LongMemoryAgent(MemoryAgent):
     """长期记忆: 根据所有的合作次数决定合作概率(0.2-0.8)"""
     
-    def __init__(self, name: Optional[str] = None):
-        super().__init__(name)
-        self.coop_prob = 0.7  # 初始合作概率
-        
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
-        if not history_opponent:
-            return "still" if random.random() < self.coop_prob else "beat"
-            
-        # 统计所有对手合作次数
-        coop_count = history_opponent.count("still")
-        
-        # 根据历史合作比例调整概率，范围在0.2-0.8之间
-        self.coop_prob = 0.2 + (coop_count / len(history_opponent)) * 0.6
-        
-        # 按概率决定是否合作
-        return "still" if random.random() < self.coop_prob else "beat"
+    __slots__ = ()
     
-    def reset(self):
-        """重置合作概率"""
-        self.coop_prob = 0.7
+    def __init__(self, name: Optional[str] = None):
+        super().__init__(None, 0.2, 0.8, name, span=0.6)
 
 
-class WinStayLoseShiftAgent(Agent):
+class WinStayLoseShiftAgent(BitboardAgent):
     """赢则保持，输则改变策略"""
     
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
-        if not history_self or not history_opponent:
-            return "still"  # 第一轮默认合作
-        
-        last_action = history_self[-1]
-        
+    deterministic = True
+    
+    __slots__ = ()
+    
+    def decide_bits(self, hs: int, ho: int, n: int) -> int:
         # 简单判断上一轮是否"赢"
-        # 这里简化处理，如果对方选择still则认为自己"赢"了
-        if history_opponent[-1] == "still":
-            return last_action  # 赢则保持
-        else:
-            # 输则改变
-            return "beat" if last_action == "still" else "still"
+        # 这里简化处理，如果对方选择still则认为自己"赢"了: 赢则保持，输则改变，
+        # 即上一轮双方动作的异或（第一轮双方位棋盘均为0，默认合作）
+        return (hs ^ ho) & 1
 
 
-class TitForTatStartMediumMemoryAgent(Agent):
+class TitForTatStartMediumMemoryAgent(MemoryAgent):
     """以牙还牙开始的近期记忆: 前5轮采用以牙还牙，之后根据近期记忆调整策略"""
     
+    __slots__ = ()
+    
     def __init__(self, name: Optional[str] = None):
-        super().__init__(name)
-        self.coop_prob = 0.7  # 初始合作概率
-        
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
-        # 前5轮使用以牙还牙
-        if len(history_opponent) < 5:
-            if not history_opponent:
-                return "still"
-            return history_opponent[-1]
-        
-        # 之后使用中期记忆策略
-        # 统计近期对手合作次数（最多15轮）
-        lookback = min(15, len(history_opponent))
-        recent_actions = history_opponent[-lookback:]
-        coop_count = recent_actions.count("still")
-        
-        # 根据合作次数调整概率，范围在0.2-0.8之间
-        self.coop_prob = 0.2 + (coop_count / lookback) * 0.6
-        
-        # 按概率决定是否合作
-        return "still" if random.random() < self.coop_prob else "beat"
+        super().__init__(15, 0.2, 0.8, name, min_history=5, span=0.6)
     
-    def reset(self):
-        """重置合作概率"""
-        self.coop_prob = 0.7
+    def _warmup(self, hs: int, ho: int, n: int) -> int:
+        # 前5轮使用以牙还牙（第一轮位棋盘为0，即still）
+        return ho & 1
 
 
-class AdaptivePunishmentAgent(Agent):
+class AdaptivePunishmentAgent(BitboardAgent):
     """适应性惩罚: 根据对手背叛倾向动态调整惩罚强度"""
     
+    deterministic = True
+    
+    __slots__ = ("punishment_level", "defect_count", "rounds", "punishment_streak")
+    
     def __init__(self, name: Optional[str] = None):
         super().__init__(name)
         self.punishment_level = 1  # 初始惩罚级别
@@ -601,19 +790,19 @@ class AdaptivePunishmentAgent(Agent):
         self.rounds = 0           # 总回合数
         self.punishment_streak = 0  # 当前连续惩罚次数
         
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
-        if not history_opponent:
-            return "still"  # 首轮默认合作
+    def decide_bits(self, hs: int, ho: int, n: int) -> int:
+        if not n:
+            return STILL  # 首轮默认合作
             
         self.rounds += 1
         
         # 如果处于惩罚模式，继续惩罚
         if self.punishment_streak > 0:
             self.punishment_streak -= 1
-            return "beat"
+            return BEAT
             
         # 如果对手上轮背叛，更新统计并考虑惩罚
-        if history_opponent[-1] == "beat":
+        if ho & 1:
             self.defect_count += 1
             
             # 计算背叛比例
@@ -629,9 +818,9 @@ class AdaptivePunishmentAgent(Agent):
                 
             # 设置惩罚持续时间
             self.punishment_streak = self.punishment_level
-            return "beat"
+            return BEAT
             
-        return "still"
+        return STILL
     
     def reset(self):
         """重置状态"""
@@ -644,24 +833,26 @@ class AdaptivePunishmentAgent(Agent):
 class GradualForgivingAgent(Agent):
     """渐进宽恕: 会渐进式惩罚对手，但也会逐渐宽恕"""
     
+    __slots__ = ("revenge_counter", "forgiveness", "rounds_since_defect")
+    
     def __init__(self, name: Optional[str] = None):
         super().__init__(name)
         self.revenge_counter = 0  # 报复计数器
         self.forgiveness = 0      # 宽恕计数器（在固定回合后宽恕）
         self.rounds_since_defect = 0  # 距离上次被背叛的回合数
         
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
+    def decide(self, history_self: Sequence[int], history_opponent: Sequence[int]) -> int:
         if not history_opponent:
-            return "still"
+            return STILL
         
         # 更新距离上次被背叛的回合数
-        if history_opponent[-1] == "beat":
+        if history_opponent[-1] == BEAT:
             self.rounds_since_defect = 0
         else:
             self.rounds_since_defect += 1
             
         # 如果对手背叛，设置报复和宽恕计时
-        if history_opponent[-1] == "beat" and history_self[-1] == "still":
+        if history_opponent[-1] == BEAT and history_self[-1] == STILL:
             # 背叛次数增加，报复也增加
             self.revenge_counter = 2  # 背叛后连续惩罚2次
             self.forgiveness = 5      # 5回合后宽恕
@@ -669,18 +860,18 @@ class GradualForgivingAgent(Agent):
         # 如果在报复模式，继续惩罚
         if self.revenge_counter > 0:
             self.revenge_counter -= 1
-            return "beat"
+            return BEAT
         
         # 如果宽恕计时结束，完全宽恕
         if self.rounds_since_defect >= self.forgiveness:
             self.forgiveness = 0  # 重置宽恕计时
-            return "still"
+            return STILL
         
         # 根据距离上次背叛的时间，增加合作概率
         coop_prob = min(0.9, 0.5 + self.rounds_since_defect * 0.1)
         
         # 按概率决定是否合作
-        return "still" if random.random() < coop_prob else "beat"
+        return STILL if _rand() < coop_prob else BEAT
     
     def reset(self):
         """重置状态"""
@@ -692,80 +883,106 @@ class GradualForgivingAgent(Agent):
 class PatternMatchingTitForTatAgent(Agent):
     """模式匹配以牙还牙: 尝试识别对手模式并进行反制"""
     
+    deterministic = True
+    
+    __slots__ = ("pattern_length", "min_occurrences", "_pattern_counts", "_follow_beats", "_recent", "_seen")
+    
     def __init__(self, name: Optional[str] = None):
         super().__init__(name)
         self.pattern_length = 4  # 尝试识别的模式长度
         self.min_occurrences = 2  # 模式至少出现次数才会考虑
+        # 以模式编码为下标: 后续动作已知的出现次数、以及之后对手选择beat的次数
+        self._pattern_counts = [0] * (1 << self.pattern_length)
+        self._follow_beats = [0] * (1 << self.pattern_length)
+        self._recent = 0  # 对手最近2*pattern_length个动作的编码（最低位为最近一回合，1=beat）
+        self._seen = 0    # 已编入索引的对手历史长度
+        
+    def decide(self, history_self: Sequence[int], history_opponent: Sequence[int]) -> int:
+        self._update_index(history_opponent)
         
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
         if not history_opponent:
-            return "still"  # 首轮默认合作
+            return STILL  # 首轮默认合作
             
         # 如果历史足够长，尝试识别模式
         if len(history_opponent) >= self.pattern_length * 3:
             # 检查对手最近的行为模式
-            pattern = self._find_best_pattern(history_opponent)
-            if pattern:
+            pattern = self._find_best_pattern(len(history_opponent))
+            if pattern is not None:
                 # 预测下一步，如果预计对方会背叛，我们也背叛
-                next_action = self._predict_next_action(history_opponent, pattern)
-                if next_action == "beat":
-                    return "beat"
+                next_action = self._predict_next_action(pattern)
+                if next_action == BEAT:
+                    return BEAT
         
         # 默认使用以牙还牙策略
         return history_opponent[-1]
     
-    def _find_best_pattern(self, history: List[str]) -> str:
+    def _update_index(self, history: Sequence[int]):
+        """将新增的对手动作编入模式索引"""
+        k = self.pattern_length
+        mask = (1 << k) - 1
+        recent_mask = (1 << (2 * k)) - 1
+        while self._seen < len(history):
+            bit = history[self._seen]
+            if self._seen >= k:
+                # 起始于 self._seen - k 的窗口的后续动作已知
+                pattern = self._recent & mask
+                self._pattern_counts[pattern] += 1
+                self._follow_beats[pattern] += bit
+            self._recent = ((self._recent << 1) | bit) & recent_mask
+            self._seen += 1
+    
+    def _find_best_pattern(self, n: int) -> Optional[int]:
         """查找历史中最常出现的模式"""
-        if len(history) < self.pattern_length * 2:
+        k = self.pattern_length
+        if n < k * 2:
             return None
             
         # 最近行为
-        recent = ''.join(['1' if a == "beat" else '0' for a in history[-self.pattern_length:]])
-        
-        # 在之前的历史中查找相同模式
-        full_history = ''.join(['1' if a == "beat" else '0' for a in history])
-        occurrences = 0
-        
-        # 从头开始搜索，跳过最后一个模式（我们当前正在判断的）
-        for i in range(len(full_history) - self.pattern_length * 2 + 1):
-            if full_history[i:i+self.pattern_length] == recent:
-                occurrences += 1
+        mask = (1 << k) - 1
+        recent = self._recent & mask
+        
+        # 在之前的历史中查找相同模式，跳过最后一个模式（我们当前正在判断的）:
+        # 已索引的位置中，起点晚于 n-2k 的窗口都落在最近2k回合内，逐个扣除
+        occurrences = self._pattern_counts[recent]
+        for shift in range(1, k):
+            if (self._recent >> shift) & mask == recent:
+                occurrences -= 1
                 
         # 如果模式出现次数达到阈值，认为模式有效
         if occurrences >= self.min_occurrences:
             return recent
         return None
     
-    def _predict_next_action(self, history: List[str], pattern: str) -> str:
+    def _predict_next_action(self, pattern: int) -> int:
         """根据找到的模式预测对手下一步动作"""
-        full_history = ''.join(['1' if a == "beat" else '0' for a in history])
-        
-        # 查找所有模式出现的位置
-        positions = []
-        for i in range(len(full_history) - len(pattern)):
-            if full_history[i:i+len(pattern)] == pattern:
-                positions.append(i)
-        
-        # 统计模式后的动作
-        next_actions = []
-        for pos in positions:
-            if pos + len(pattern) < len(full_history):
-                next_actions.append(full_history[pos + len(pattern)])
+        # 统计模式所有出现位置之后的动作
+        total = self._pattern_counts[pattern]
         
         # 如果有足够数据，预测最可能的下一步
-        if next_actions:
+        if total:
             # 计算背叛概率
-            defect_prob = next_actions.count('1') / len(next_actions)
+            defect_prob = self._follow_beats[pattern] / total
             # 如果背叛概率大于50%，预测对方会背叛
             if defect_prob > 0.5:
-                return "beat"
+                return BEAT
         
-        return "still"
+        return STILL
+    
+    def reset(self):
+        """重置模式索引"""
+        self._pattern_counts = [0] * (1 << self.pattern_length)
+        self._follow_beats = [0] * (1 << self.pattern_length)
+        self._recent = 0
+        self._seen = 0
 
 
-class FrequencyAnalysisAgent(Agent):
+class FrequencyAnalysisAgent(BitboardAgent):
     """频率分析智能体: 分析对手背叛频率，根据不同情境调整策略"""
     
+    deterministic = True
+    
+    __slots__ = ("after_still_defect", "after_still_total", "after_beat_defect", "after_beat_total", "_seen")
+    
     def __init__(self, name: Optional[str] = None):
         super().__init__(name)
         # 追踪在我选择still后对方的背叛频率
@@ -774,22 +991,21 @@ class FrequencyAnalysisAgent(Agent):
         # 追踪在我选择beat后对方的背叛频率
         self.after_beat_defect = 0
         self.after_beat_total = 0
-        
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
-        # 更新统计数据
-        if len(history_self) > 1 and len(history_opponent) > 1:
-            if history_self[-2] == "still":
-                self.after_still_total += 1
-                if history_opponent[-1] == "beat":
-                    self.after_still_defect += 1
-            else:  # history_self[-2] == "beat"
-                self.after_beat_total += 1
-                if history_opponent[-1] == "beat":
-                    self.after_beat_defect += 1
+        self._seen = 0  # 已统计的回合数
+        
+    def decide_bits(self, hs: int, ho: int, n: int) -> int:
+        # 新增回合需要读取我方前一回合(第n-seen位)的动作，已有统计时可读的新增回合比位棋盘长度少一
+        if n - self._seen > HISTORY_BITS or (self._seen > 0 and n - self._seen >= HISTORY_BITS):
+            raise ValueError("新增回合数超出位棋盘长度，请逐回合调用或使用decide")
+        # 只统计上次调用后新增的回合: 第i回合对手动作与我方第i-1回合动作配对
+        while self._seen < n:
+            if self._seen > 0:
+                self._count_response((hs >> (n - self._seen)) & 1, (ho >> (n - 1 - self._seen)) & 1)
+            self._seen += 1
         
         # 前几轮默认合作
-        if len(history_opponent) < 5:
-            return "still"
+        if n < 5:
+            return STILL
             
         # 计算不同情境下的背叛概率
         after_still_defect_rate = self.after_still_defect / max(1, self.after_still_total)
@@ -798,18 +1014,34 @@ class FrequencyAnalysisAgent(Agent):
         # 策略选择
         # 如果对手在我们合作后经常背叛，我们选择背叛
         if after_still_defect_rate > 0.6:
-            return "beat"
+            return BEAT
         # 如果对手在我们背叛后经常背叛（报复），但在我们合作后不背叛，选择合作
         elif after_beat_defect_rate > after_still_defect_rate + 0.3:
-            return "still"
+            return STILL
         # 如果对手不管我们做什么都倾向于背叛，我们也背叛
         elif after_still_defect_rate > 0.4 and after_beat_defect_rate > 0.4:
-            return "beat"
+            return BEAT
         # 如果我们判断不出明显的模式，使用以牙还牙策略
         else:
-            if not history_opponent:
-                return "still"
-            return history_opponent[-1]
+            return ho & 1
+    
+    def decide(self, history_self: Sequence[int], history_opponent: Sequence[int]) -> int:
+        # 直接按序列统计新增回合，不受位棋盘只保留最近HISTORY_BITS回合的限制
+        n = len(history_opponent)
+        while self._seen < n:
+            if self._seen > 0:
+                self._count_response(history_self[self._seen - 1], history_opponent[self._seen])
+            self._seen += 1
+        return super().decide(history_self, history_opponent)
+    
+    def _count_response(self, my_prev_action: int, opp_action: int):
+        """记录对手在我方上一回合动作之后的反应"""
+        if my_prev_action == STILL:
+            self.after_still_total += 1
+            self.after_still_defect += opp_action
+        else:
+            self.after_beat_total += 1
+            self.after_beat_defect += opp_action
     
     def reset(self):
         """重置统计数据"""
@@ -817,33 +1049,40 @@ class FrequencyAnalysisAgent(Agent):
         self.after_still_total = 0
         self.after_beat_defect = 0
         self.after_beat_total = 0
+        self._seen = 0
 
 
 class RhythmDetectorAgent(Agent):
     """节奏检测智能体: 尝试识别对手是否有固定的合作/背叛节奏"""
     
+    # 常见的固定周期模式
+    RHYTHMS = (
+        (BEAT,),  # 总是背叛
+        (STILL,),  # 总是合作
+        (BEAT, STILL),  # 交替背叛和合作
+        (STILL, STILL, BEAT),  # 两合作一背叛
+        (STILL, BEAT, BEAT)   # 一合作两背叛
+    )
+    
+    __slots__ = ("detected_rhythm", "rhythm_confidence", "_rhythm_matches", "_seen")
+    
     def __init__(self, name: Optional[str] = None):
         super().__init__(name)
         self.detected_rhythm = None  # 检测到的节奏
         self.rhythm_confidence = 0   # 节奏的置信度
+        self._rhythm_matches = [0] * len(self.RHYTHMS)  # 每种节奏已吻合的回合数
+        self._seen = 0  # 已统计的对手历史长度
         
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
-        if len(history_opponent) < 6:
-            return "still"  # 前几轮默认合作
+    def decide(self, history_self: Sequence[int], history_opponent: Sequence[int]) -> int:
+        n = len(history_opponent)
+        if n < 6:
+            return STILL  # 前几轮默认合作
             
         # 尝试检测对手是否有固定节奏
         if not self.detected_rhythm:
-            # 检查常见的固定周期模式
-            rhythms = [
-                ["beat"],  # 总是背叛
-                ["still"],  # 总是合作
-                ["beat", "still"],  # 交替背叛和合作
-                ["still", "still", "beat"],  # 两合作一背叛
-                ["still", "beat", "beat"]   # 一合作两背叛
-            ]
-            
-            for rhythm in rhythms:
-                confidence = self._check_rhythm(history_opponent, rhythm)
+            self._update_rhythm_matches(history_opponent)
+            for rhythm, matches in zip(self.RHYTHMS, self._rhythm_matches):
+                confidence = matches / n
                 if confidence > 0.7 and confidence > self.rhythm_confidence:
                     self.detected_rhythm = rhythm
                     self.rhythm_confidence = confidence
@@ -851,160 +1090,146 @@ class RhythmDetectorAgent(Agent):
         # 如果检测到节奏，根据预测采取最优应对
         if self.detected_rhythm:
             # 预测对手下一步
-            next_idx = len(history_opponent) % len(self.detected_rhythm)
+            next_idx = n % len(self.detected_rhythm)
             predicted_next = self.detected_rhythm[next_idx]
             
             # 如果预测对手会背叛，我们也背叛
-            if predicted_next == "beat":
-                return "beat"
+            if predicted_next == BEAT:
+                return BEAT
             else:
                 # 如果检测到对手总是合作，偶尔背叛一下
-                if len(self.detected_rhythm) == 1 and self.detected_rhythm[0] == "still":
-                    if random.random() < 0.1:  # 10%概率背叛
-                        return "beat"
-                return "still"
+                if len(self.detected_rhythm) == 1 and self.detected_rhythm[0] == STILL:
+                    if _rand() < 0.1:  # 10%概率背叛
+                        return BEAT
+                return STILL
         
         # 如果没有检测到明确节奏，使用以牙还牙策略
-        if not history_opponent:
-            return "still"
         return history_opponent[-1]
     
-    def _check_rhythm(self, history: List[str], pattern: List[str]) -> float:
-        """检查历史中是否符合给定节奏模式，返回置信度"""
-        if not history or not pattern:
-            return 0.0
-            
-        matches = 0
-        total = 0
-        
-        # 根据模式的周期检查历史
-        for i in range(len(history)):
-            expected = pattern[i % len(pattern)]
-            if history[i] == expected:
-                matches += 1
-            total += 1
-            
-        return matches / total if total > 0 else 0.0
+    def _update_rhythm_matches(self, history: Sequence[int]):
+        """只统计上次调用后新增的回合，累计每种节奏与对手历史吻合的次数"""
+        matches = self._rhythm_matches
+        while self._seen < len(history):
+            action = history[self._seen]
+            for r, rhythm in enumerate(self.RHYTHMS):
+                matches[r] += action == rhythm[self._seen % len(rhythm)]
+            self._seen += 1
     
     def reset(self):
         """重置检测状态"""
         self.detected_rhythm = None
         self.rhythm_confidence = 0
+        self._rhythm_matches = [0] * len(self.RHYTHMS)
+        self._seen = 0
+
+
+def _hybrid_tit_for_tat(hs: int, ho: int) -> int:
+    return ho & 1
 
 
-class HybridAgent(Agent):
+def _hybrid_always_beat(hs: int, ho: int) -> int:
+    return BEAT
+
+
+def _hybrid_always_still(hs: int, ho: int) -> int:
+    return STILL
+
+
+class HybridAgent(BitboardAgent):
     """混合策略: 根据对手表现动态切换不同策略"""
     
+    deterministic = True
+    
+    # 候选策略表（类级共享），实例只记录当前策略的下标和各策略评分
+    STRATEGIES = (
+        ("tit_for_tat", _hybrid_tit_for_tat),
+        ("always_beat", _hybrid_always_beat),
+        ("always_still", _hybrid_always_still)
+    )
+    
+    __slots__ = ("current_strategy", "strategy_performance", "rounds", "last_switch")
+    
     def __init__(self, name: Optional[str] = None):
         super().__init__(name)
-        self.strategies = {
-            "tit_for_tat": lambda h_self, h_opp: h_opp[-1] if h_opp else "still",
-            "always_beat": lambda h_self, h_opp: "beat",
-            "always_still": lambda h_self, h_opp: "still"
-        }
-        self.current_strategy = "tit_for_tat"  # 默认策略
-        self.strategy_performance = {s: 0 for s in self.strategies}  # 策略表现评分
+        self.current_strategy = 0  # 当前策略在STRATEGIES中的下标，默认以牙还牙
+        self.strategy_performance = [0] * len(self.STRATEGIES)  # 策略表现评分
         self.rounds = 0
         self.last_switch = 0  # 上次切换策略的回合
         
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
+    def decide_bits(self, hs: int, ho: int, n: int) -> int:
         self.rounds += 1
         
         # 每10轮考虑切换一次策略
         if self.rounds - self.last_switch >= 10:
-            self._evaluate_strategies(history_self, history_opponent)
+            self._evaluate_strategies(hs, ho, n)
             self.last_switch = self.rounds
             
         # 使用当前最佳策略
-        return self.strategies[self.current_strategy](history_self, history_opponent)
+        return self.STRATEGIES[self.current_strategy][1](hs, ho)
     
-    def _evaluate_strategies(self, history_self: List[str], history_opponent: List[str]):
+    def _evaluate_strategies(self, hs: int, ho: int, n: int):
         """评估不同策略的表现，选择最佳策略"""
-        if len(history_opponent) < 10:
+        if n < 10:
             return  # 历史不足，保持当前策略
             
-        # 获取最近10轮历史
-        recent_opponent = history_opponent[-10:]
-        recent_self = history_self[-10:]
-        
-        # 重置评分
-        self.strategy_performance = {s: 0 for s in self.strategies}
-        
-        # 模拟每种策略在最近10轮的表现
-        for strategy_name, strategy_func in self.strategies.items():
-            score = 0
-            
-            # 假设我们一直使用该策略，评估得分
-            for i in range(10):
-                if i == 0 and len(history_opponent) <= 10:
-                    # 第一轮没有前置历史
-                    action = "still"
-                else:
-                    # 使用策略决定动作
-                    prev_self = recent_self[:i] if i > 0 else history_self[-(10+i):-10]
-                    prev_opp = recent_opponent[:i] if i > 0 else history_opponent[-(10+i):-10]
-                    action = strategy_func(prev_self, prev_opp)
-                    
-                # 根据我方动作和对方实际动作计算得分
-                opp_action = recent_opponent[i]
-                if action == "still" and opp_action == "still":
-                    # 双方合作
-                    score += 3  # 假设wwin=3
-                elif action == "beat" and opp_action == "still":
-                    # 我背叛对方合作
-                    score += 5  # 假设beat=5
-                elif action == "still" and opp_action == "beat":
-                    # 我合作对方背叛
-                    score += -2  # 假设beaten=-2
-                else:  # action == "beat" and opp_action == "beat"
-                    # 双方都背叛
-                    score += 1  # 假设llost=1
-                    
-            # 更新策略评分
-            self.strategy_performance[strategy_name] = score
+        # 最近10轮对手动作（第9位为最早一轮，第0位为最近一轮）
+        recent = ho & 0x3FF
+        beats = recent.bit_count()
+        stills = 10 - beats
+        
+        # 以牙还牙在最近10轮中第一轮合作，之后复制对手前一轮:
+        # 将对手前9轮(prev)与后9轮(cur)逐位对齐，统计四种动作组合
+        prev = recent >> 1
+        cur = recent & 0x1FF
+        both_still = (~(prev | cur) & 0x1FF).bit_count()
+        beat_still = (prev & ~cur & 0x1FF).bit_count()
+        still_beat = (~prev & cur & 0x1FF).bit_count()
+        both_beat = (prev & cur).bit_count()
+        first_beat = (recent >> 9) & 1
+        first = -2 if first_beat else 3  # 第一轮合作的得分
+        
+        # 假设 wwin=3, beat=5, beaten=-2, llost=1
+        always_beat = 5 * stills + beats
+        if n <= 10:
+            # 第一轮没有前置历史，所有策略都默认合作
+            always_beat += first - (1 if first_beat else 5)
+        performance = self.strategy_performance
+        performance[0] = first + 3 * both_still + 5 * beat_still - 2 * still_beat + both_beat
+        performance[1] = always_beat
+        performance[2] = 3 * stills - 2 * beats
             
-        # 选择得分最高的策略
-        self.current_strategy = max(
-            self.strategy_performance.items(),
-            key=lambda x: x[1]
-        )[0]
+        # 选择得分最高的策略（并列时取靠前者）
+        self.current_strategy = max(range(len(performance)), key=performance.__getitem__)
     
     def reset(self):
         """重置状态"""
-        self.current_strategy = "tit_for_tat"
-        self.strategy_performance = {s: 0 for s in self.strategies}
+        self.current_strategy = 0
+        self.strategy_performance = [0] * len(self.STRATEGIES)
         self.rounds = 0
         self.last_switch = 0
 
 
-class PavlovAgent(Agent):
+class PavlovAgent(BitboardAgent):
     """巴甫洛夫策略: 上回合获益则保持策略，否则改变策略"""
     
+    deterministic = True
+    
+    __slots__ = ("last_payoff", "default_action")
+    
     def __init__(self, name: Optional[str] = None):
         super().__init__(name)
         self.last_payoff = None  # 上一轮的收益
-        self.default_action = "still"  # 第一轮默认行动
+        self.default_action = STILL  # 第一轮默认行动
     
-    def decide(self, history_self: List[str], history_opponent: List[str]) -> str:
-        if not history_self or not history_opponent:
+    def decide_bits(self, hs: int, ho: int, n: int) -> int:
+        if not n:
             return self.default_action
             
-        # 计算上一轮的收益
-        last_action_self = history_self[-1]
-        last_action_opp = history_opponent[-1]
-        
-        if last_action_self == "still" and last_action_opp == "still":
-            # 双方合作，保持合作
-            return "still"
-        elif last_action_self == "beat" and last_action_opp == "still":
-            # 我背叛对方合作，继续背叛
-            return "beat"
-        elif last_action_self == "still" and last_action_opp == "beat":
-            # 我合作对方背叛，改变策略
-            return "beat"
-        else:  # last_action_self == "beat" and last_action_opp == "beat"
-            # 双方都背叛，改变策略
-            return "still"
+        # 根据上一轮双方动作决定:
+        #   双方合作 -> 保持合作;  我背叛对方合作 -> 继续背叛
+        #   我合作对方背叛 -> 改为背叛;  双方都背叛 -> 改为合作
+        # 即上一轮双方动作的异或
+        return (hs ^ ho) & 1
             
     def reset(self):
         """重置状态"""
@@ -1,7 +1,7 @@
 import os
 import logging
 import argparse
-from typing import List
+from typing import Dict, List, Type
 
 from config import GameConfig
 from agent import (
@@ -23,40 +23,45 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 智能体类到显示名称的注册表（按参赛顺序排列）
+AGENT_DISPLAY_NAMES: Dict[Type[Agent], str] = {
+    TitForTatAgent: "以牙还牙",
+    AlwaysBeatAgent: "总是背叛",
+    AlwaysStillAgent: "总是合作",
+    RandomAgent: "随机策略",
+    ForgivingTitForTatAgent: "宽容的以牙还牙",
+    GradualAgent: "渐进报复",
+    PatternDetectorAgent: "模式识别",
+    AdaptiveAgent: "自适应",
+    WinStayLoseShiftAgent: "赢则保持输则改变",
+    TwoCoopOneDefectAgent: "两合作一背叛",
+    RewardPunishmentAgent: "助长惩罚",
+    EscapeTigerAgent: "虎口脱险",
+    InchingAgent: "得寸进尺",
+    TrustBuildingAgent: "信任建立",
+    GrudgeAgent: "记仇",
+    PunishmentEscalationAgent: "惩罚升级",
+    ConsensusAgent: "共识策略",
+    ProbeAgent: "试探策略",
+    CappedAgent: "封顶策略",
+    ShortMemoryAgent: "短期记忆",
+    MediumMemoryAgent: "中期记忆",
+    LongMemoryAgent: "长期记忆",
+    TitForTatStartMediumMemoryAgent: "以牙还牙开始的中期记忆",
+    AdaptivePunishmentAgent: "适应性惩罚",
+    GradualForgivingAgent: "渐进宽恕",
+    PatternMatchingTitForTatAgent: "模式匹配以牙还牙",
+    FrequencyAnalysisAgent: "频率分析",
+    RhythmDetectorAgent: "节奏检测",
+    HybridAgent: "混合策略",
+    PavlovAgent: "巴甫洛夫策略"
+}
+# 按类名查找智能体类，供个人赛按名称创建智能体
+AGENT_CLASSES: Dict[str, Type[Agent]] = {cls.__name__: cls for cls in AGENT_DISPLAY_NAMES}
+
 def get_all_agents() -> List[Agent]:
     """创建所有可用的智能体实例"""
-    return [
-        TitForTatAgent("以牙还牙"),
-        AlwaysBeatAgent("总是背叛"),
-        AlwaysStillAgent("总是合作"),
-        RandomAgent("随机策略"),
-        ForgivingTitForTatAgent("宽容的以牙还牙"),
-        GradualAgent("渐进报复"),
-        PatternDetectorAgent("模式识别"),
-        AdaptiveAgent("自适应"),
-        WinStayLoseShiftAgent("赢则保持输则改变"),
-        TwoCoopOneDefectAgent("两合作一背叛"),
-        RewardPunishmentAgent("助长惩罚"),
-        EscapeTigerAgent("虎口脱险"),
-        InchingAgent("得寸进尺"),
-        TrustBuildingAgent("信任建立"),
-        GrudgeAgent("记仇"),
-        PunishmentEscalationAgent("惩罚升级"),
-        ConsensusAgent("共识策略"),
-        ProbeAgent("试探策略"),
-        CappedAgent("封顶策略"),
-        ShortMemoryAgent("短期记忆"),
-        MediumMemoryAgent("中期记忆"),
-        LongMemoryAgent("长期记忆"),
-        TitForTatStartMediumMemoryAgent("以牙还牙开始的中期记忆"),
-        AdaptivePunishmentAgent("适应性惩罚"),
-        GradualForgivingAgent("渐进宽恕"),
-        PatternMatchingTitForTatAgent("模式匹配以牙还牙"),
-        FrequencyAnalysisAgent("频率分析"),
-        RhythmDetectorAgent("节奏检测"),
-        HybridAgent("混合策略"),
-        PavlovAgent("巴甫洛夫策略")
-    ]
+    return [cls(display_name) for cls, display_name in AGENT_DISPLAY_NAMES.items()]
 
 def run_individual_match(config: GameConfig, agent_a: Agent, agent_b: Agent, log_file: str = None):
     """
@@ -88,7 +93,8 @@ def run_individual_match(config: GameConfig, agent_a: Agent, agent_b: Agent, log
     
     return result
 
-def run_tournament(config: GameConfig, agents: List[Agent] = None, log_file: str = None):
+def run_tournament(config: GameConfig, agents: List[Agent] = None, log_file: str = None,
+                   workers: int = None):
     """
     运行大比赛
     
@@ -96,6 +102,7 @@ def run_tournament(config: GameConfig, agents: List[Agent] = None, log_file: str
         config: 游戏配置
         agents: 参与比赛的智能体列表（默认使用所有可用智能体）
         log_file: 日志文件路径（可选）
+        workers: 并行对抗的进程数（可选，默认使用全部CPU核心）
     """
     if agents is None:
         agents = get_all_agents()
@@ -110,7 +117,7 @@ def run_tournament(config: GameConfig, agents: List[Agent] = None, log_file: str
     logger.info(f"参赛智能体: {[agent.name for agent in agents]}")
     
     # 运行大比赛
-    tournament = Tournament(config, agents, log_file)
+    tournament = Tournament(config, agents, log_file, workers)
     ranked = tournament.run()
     
     # 保存结果
@@ -150,47 +157,17 @@ def parse_args():
                         help='个人赛智能体2名称（仅在个人赛模式下使用）')
     parser.add_argument('--log', type=str, default=None,
                         help='日志文件路径')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='大比赛并行对抗的进程数（默认使用全部CPU核心，1表示不并行）')
     return parser.parse_args()
 
 def get_agent_by_name(name: str) -> Agent:
     """根据名称获取智能体实例"""
-    agents = {
-        'TitForTatAgent': TitForTatAgent("以牙还牙"),
-        'AlwaysBeatAgent': AlwaysBeatAgent("总是背叛"),
-        'AlwaysStillAgent': AlwaysStillAgent("总是合作"),
-        'RandomAgent': RandomAgent("随机策略"),
-        'ForgivingTitForTatAgent': ForgivingTitForTatAgent("宽容的以牙还牙"),
-        'GradualAgent': GradualAgent("渐进报复"),
-        'PatternDetectorAgent': PatternDetectorAgent("模式识别"),
-        'AdaptiveAgent': AdaptiveAgent("自适应"),
-        'WinStayLoseShiftAgent': WinStayLoseShiftAgent("赢则保持输则改变"),
-        'TwoCoopOneDefectAgent': TwoCoopOneDefectAgent("两合作一背叛"),
-        'RewardPunishmentAgent': RewardPunishmentAgent("助长惩罚"),
-        'EscapeTigerAgent': EscapeTigerAgent("虎口脱险"),
-        'InchingAgent': InchingAgent("得寸进尺"),
-        'TrustBuildingAgent': TrustBuildingAgent("信任建立"),
-        'GrudgeAgent': GrudgeAgent("记仇"),
-        'PunishmentEscalationAgent': PunishmentEscalationAgent("惩罚升级"),
-        'ConsensusAgent': ConsensusAgent("共识策略"),
-        'ProbeAgent': ProbeAgent("试探策略"),
-        'CappedAgent': CappedAgent("封顶策略"),
-        'ShortMemoryAgent': ShortMemoryAgent("短期记忆"),
-        'MediumMemoryAgent': MediumMemoryAgent("中期记忆"),
-        'LongMemoryAgent': LongMemoryAgent("长期记忆"),
-        'TitForTatStartMediumMemoryAgent': TitForTatStartMediumMemoryAgent("以牙还牙开始的中期记忆"),
-        'AdaptivePunishmentAgent': AdaptivePunishmentAgent("适应性惩罚"),
-        'GradualForgivingAgent': GradualForgivingAgent("渐进宽恕"),
-        'PatternMatchingTitForTatAgent': PatternMatchingTitForTatAgent("模式匹配以牙还牙"),
-        'FrequencyAnalysisAgent': FrequencyAnalysisAgent("频率分析"),
-        'RhythmDetectorAgent': RhythmDetectorAgent("节奏检测"),
-        'HybridAgent': HybridAgent("混合策略"),
-        'PavlovAgent': PavlovAgent("巴甫洛夫策略")
-    }
-    
-    if name not in agents:
-        raise ValueError(f"未知智能体名称: {name}，可用智能体: {list(agents.keys())}")
+    if name not in AGENT_CLASSES:
+        raise ValueError(f"未知智能体名称: {name}，可用智能体: {list(AGENT_CLASSES.keys())}")
     
-    return agents[name]
+    cls = AGENT_CLASSES[name]
+    return cls(AGENT_DISPLAY_NAMES[cls])
 
 if __name__ == "__main__":
     # 解析命令行参数
@@ -217,7 +194,7 @@ if __name__ == "__main__":
             exit(1)
     else:  # tournament
         try:
-            run_tournament(config, get_all_agents(), args.log)
+            run_tournament(config, get_all_agents(), args.log, args.workers)
         except Exception as e:
             logger.error(f"大比赛运行错误: {e}")
             exit(1)
\ No newline at end of file
@@ -1,23 +1,32 @@
 import logging
-from typing import Tuple, List
+import operator
+from typing import Tuple, List, Optional
 
 from config import GameConfig
-from agent import Agent
+from agent import Agent, BitboardAgent, BEAT, STILL, HISTORY_MASK, action_name
 
 class MatchResult:
     """单次对抗的结果记录"""
     def __init__(self):
         self.scores_a: List[int] = []  # 每场对抗中智能体A的得分列表
         self.scores_b: List[int] = []  # 每场对抗中智能体B的得分列表
-        self.histories_a: List[List[str]] = []  # 每场对抗中智能体A的决策历史
-        self.histories_b: List[List[str]] = []  # 每场对抗中智能体B的决策历史
+        self.histories_a: List[bytearray] = []  # 每场对抗中智能体A的决策历史
+        self.histories_b: List[bytearray] = []  # 每场对抗中智能体B的决策历史
+        self._sorted_scores: Optional[Tuple[List[int], List[int]]] = None  # 排序后的得分缓存
     
-    def add_match(self, score_a: int, score_b: int, history_a: List[str], history_b: List[str]):
-        """添加一场对抗的结果"""
+    def add_match(self, score_a: int, score_b: int, history_a: bytearray, history_b: bytearray):
+        """添加一场对抗的结果（直接保存传入的历史，调用方之后不应再修改）"""
         self.scores_a.append(score_a)
         self.scores_b.append(score_b)
-        self.histories_a.append(history_a.copy())
-        self.histories_b.append(history_b.copy())
+        self.histories_a.append(history_a)
+        self.histories_b.append(history_b)
+        self._sorted_scores = None
+    
+    def _get_sorted_scores(self) -> Tuple[List[int], List[int]]:
+        """获取排序后的双方得分（排序一次后缓存，添加新结果时失效）"""
+        if self._sorted_scores is None:
+            self._sorted_scores = (sorted(self.scores_a), sorted(self.scores_b))
+        return self._sorted_scores
     
     def get_avg_scores(self) -> Tuple[float, float]:
         """获取平均得分"""
@@ -27,39 +36,31 @@ class MatchResult:
     
     def get_min_scores(self) -> Tuple[int, int]:
         """获取最低得分"""
-        min_a = min(self.scores_a) if self.scores_a else 0
-        min_b = min(self.scores_b) if self.scores_b else 0
+        sorted_a, sorted_b = self._get_sorted_scores()
+        min_a = sorted_a[0] if sorted_a else 0
+        min_b = sorted_b[0] if sorted_b else 0
         return min_a, min_b
     
     def get_middle_scores(self) -> Tuple[float, float]:
         """获取中位数得分"""
-        sorted_a = sorted(self.scores_a)
-        sorted_b = sorted(self.scores_b)
+        sorted_a, sorted_b = self._get_sorted_scores()
         mid_a = sorted_a[len(sorted_a) // 2] if sorted_a else 0
         mid_b = sorted_b[len(sorted_b) // 2] if sorted_b else 0
         return mid_a, mid_b\
         
     def get_025_scores(self) -> Tuple[float, float]:
         """获取25%分位数得分"""
-        sorted_a = sorted(self.scores_a)
-        sorted_b = sorted(self.scores_b)
+        sorted_a, sorted_b = self._get_sorted_scores()
         q1_a = sorted_a[int(len(sorted_a) * 0.25)] if len(sorted_a) > 3 else 0
         q1_b = sorted_b[int(len(sorted_b) * 0.25)] if len(sorted_b) > 3 else 0
         return q1_a, q1_b
     
     def get_win_count_info(self) -> str:
         """获取胜负情况统计"""
-        win_a = 0
-        win_b = 0
-        draws = 0
-        
-        for score_a, score_b in zip(self.scores_a, self.scores_b):
-            if score_a > score_b:
-                win_a += 1
-            elif score_b > score_a:
-                win_b += 1
-            else:
-                draws += 1
+        # 逐场比较在C层完成，平局数由总场数推出
+        win_a = sum(map(operator.gt, self.scores_a, self.scores_b))
+        win_b = sum(map(operator.lt, self.scores_a, self.scores_b))
+        draws = len(self.scores_a) - win_a - win_b
         
         return f"A胜:{win_a} B胜:{win_b} 平局:{draws}"
     
@@ -86,6 +87,13 @@ class Match:
         """
         self.config = config
         self.logger = logging.getLogger('Match')
+        # 得分表: reward[己方动作][对方动作]（动作编码 STILL=0，BEAT=1）
+        self.reward = (
+            (config.wwin, config.beaten),  # 己方still: 对方still / 对方beat
+            (config.beat, config.llost)    # 己方beat: 对方still / 对方beat
+        )
+        # 以 (action_a << 1) | action_b 为下标的 (reward_a, reward_b) 表，供逐回合计分
+        self.pair_rewards = tuple(self._calculate_reward(a, b) for a in (STILL, BEAT) for b in (STILL, BEAT))
     
     def run(self, agent_a: Agent, agent_b: Agent) -> MatchResult:
         """
@@ -98,24 +106,29 @@ class Match:
         返回:
             包含所有对抗结果的MatchResult对象
         """
-        self.logger.info(f"开始对抗: {agent_a} vs {agent_b}")
+        self.logger.info("开始对抗: %s vs %s", agent_a, agent_b)
         result = MatchResult()
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+        # 双方都是确定性策略时每场结果相同，只运行第一场，其余场次复用其结果
+        deterministic = agent_a.deterministic and agent_b.deterministic
         
         for match_idx in range(self.config.num_matches):
-            # 每场对抗前重置智能体
-            agent_a.reset()
-            agent_b.reset()
-            
-            # 运行单场对抗
-            score_a, score_b, history_a, history_b = self._run_single_match(agent_a, agent_b)
+            if not (deterministic and match_idx):
+                # 每场对抗前重置智能体
+                agent_a.reset()
+                agent_b.reset()
+                
+                # 运行单场对抗
+                score_a, score_b, history_a, history_b = self._run_single_match(agent_a, agent_b)
             result.add_match(score_a, score_b, history_a, history_b)
             
-            self.logger.debug(f"第{match_idx+1}场对抗结束，得分: A={score_a}, B={score_b}")
+            if debug:
+                self.logger.debug("第%d场对抗结束，得分: A=%s, B=%s", match_idx + 1, score_a, score_b)
         
-        self.logger.info(f"对抗结束: {agent_a} vs {agent_b}, 结果: {result}")
+        self.logger.info("对抗结束: %s vs %s, 结果: %s", agent_a, agent_b, result)
         return result
     
-    def _run_single_match(self, agent_a: Agent, agent_b: Agent) -> Tuple[int, int, List[str], List[str]]:
+    def _run_single_match(self, agent_a: Agent, agent_b: Agent) -> Tuple[int, int, bytearray, bytearray]:
         """
         执行单场对抗
         
@@ -124,33 +137,96 @@ class Match:
             agent_b: 第二个智能体
             
         返回:
-            (a_score, b_score, a_history, b_history): 智能体得分和决策历史
+            (a_score, b_score, a_history, b_history): 智能体得分和决策历史（BEAT=1，STILL=0）
         """
-        history_a, history_b = [], []
+        rounds = self.config.rounds_per_match
+        # 双方动作都与对手无关时，直接生成整场动作序列并按动作组合计分
+        if agent_a.precompute_actions is not None and agent_b.precompute_actions is not None:
+            return self._score_precomputed(bytearray(agent_a.precompute_actions(rounds)),
+                                           bytearray(agent_b.precompute_actions(rounds)))
+        
+        history_a, history_b = bytearray(), bytearray()
+        bits_a, bits_b = 0, 0  # 双方历史的位棋盘，最低位为最近一回合
+        bitboard_a = isinstance(agent_a, BitboardAgent)
+        bitboard_b = isinstance(agent_b, BitboardAgent)
         total_a, total_b = 0, 0
         
-        for round_idx in range(self.config.rounds_per_match):
+        # 循环前取出决策方法和得分表，回合内只做局部变量访问
+        decide_a = agent_a.decide_bits if bitboard_a else agent_a.decide
+        decide_b = agent_b.decide_bits if bitboard_b else agent_b.decide
+        rewards = self.pair_rewards
+        # 日志级别在循环前判断一次，未开启DEBUG时不再逐回合格式化日志
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+        
+        for round_idx in range(rounds):
             # 获取两个智能体的决策
-            action_a = agent_a.decide(history_a, history_b)
-            action_b = agent_b.decide(history_b, history_a)
+            if bitboard_a:
+                action_a = decide_a(bits_a, bits_b, round_idx)
+            else:
+                action_a = decide_a(history_a, history_b)
+            if bitboard_b:
+                action_b = decide_b(bits_b, bits_a, round_idx)
+            else:
+                action_b = decide_b(history_b, history_a)
             
             # 验证决策的合法性
-            if action_a not in ["beat", "still"] or action_b not in ["beat", "still"]:
-                self.logger.error(f"非法动作: A={action_a}, B={action_b}")
-                raise ValueError(f"智能体只能返回 'beat' 或 'still'，而不是 A={action_a}, B={action_b}")
+            if action_a not in (BEAT, STILL) or action_b not in (BEAT, STILL):
+                self.logger.error("非法动作: A=%r, B=%r", action_a, action_b)
+                raise ValueError(f"智能体只能返回 BEAT(1) 或 STILL(0)，而不是 A={action_a}, B={action_b}")
             
             # 计算得分
-            reward_a, reward_b = self._calculate_reward(action_a, action_b)
+            reward_a, reward_b = rewards[(action_a << 1) | action_b]
               # 更新历史和总分
             history_a.append(action_a)
             history_b.append(action_b)
+            bits_a = ((bits_a << 1) | action_a) & HISTORY_MASK
+            bits_b = ((bits_b << 1) | action_b) & HISTORY_MASK
             total_a += reward_a
             total_b += reward_b
-            self.logger.debug(f"回合 {round_idx+1}: A={action_a}, B={action_b}, 得分: A={reward_a}, B={reward_b}")
+            if debug:
+                self.logger.debug("回合 %d: A=%s, B=%s, 得分: A=%s, B=%s", round_idx + 1,
+                                  action_name(action_a), action_name(action_b), reward_a, reward_b)
+        
+        return total_a, total_b, history_a, history_b
+    
+    def _score_precomputed(self, history_a: bytearray, history_b: bytearray) -> Tuple[int, int, bytearray, bytearray]:
+        """
+        根据双方预先生成的整场动作序列计分
+        
+        参数:
+            history_a: 智能体A的动作序列
+            history_b: 智能体B的动作序列
+            
+        返回:
+            (a_score, b_score, a_history, b_history): 与_run_single_match相同
+        """
+        rounds = self.config.rounds_per_match
+        if len(history_a) != rounds or len(history_b) != rounds \
+                or history_a.translate(None, b"\x00\x01") or history_b.translate(None, b"\x00\x01"):
+            raise ValueError("预生成的动作序列长度必须等于回合数，且只能包含 BEAT(1) 或 STILL(0)")
+        
+        # 每个动作占一个字节，转换为整数后按位与即可统计双方同时beat的回合数
+        both_beat = (int.from_bytes(history_a, "big") & int.from_bytes(history_b, "big")).bit_count()
+        beats_a, beats_b = history_a.count(BEAT), history_b.count(BEAT)
+        counts = (
+            (len(history_a) - beats_a - beats_b + both_beat, beats_b - both_beat),  # A still: B still / B beat
+            (beats_a - both_beat, both_beat)                                         # A beat: B still / B beat
+        )
+        
+        reward = self.reward
+        total_a = sum(counts[a][b] * reward[a][b] for a in (STILL, BEAT) for b in (STILL, BEAT))
+        total_b = sum(counts[a][b] * reward[b][a] for a in (STILL, BEAT) for b in (STILL, BEAT))
         
+        # 开启DEBUG时按预生成的序列补记逐回合日志，计分路径不随日志级别改变
+        if self.logger.isEnabledFor(logging.DEBUG):
+            rewards = self.pair_rewards
+            for round_idx, (action_a, action_b) in enumerate(zip(history_a, history_b)):
+                reward_a, reward_b = rewards[(action_a << 1) | action_b]
+                self.logger.debug("回合 %d: A=%s, B=%s, 得分: A=%s, B=%s", round_idx + 1,
+                                  action_name(action_a), action_name(action_b), reward_a, reward_b)
         return total_a, total_b, history_a, history_b
     
-    def _calculate_reward(self, action_a: str, action_b: str) -> Tuple[int, int]:
+    def _calculate_reward(self, action_a: int, action_b: int) -> Tuple[int, int]:
         """
         计算两个智能体的得分
         
@@ -161,15 +237,4 @@ class Match:
         返回:
             (reward_a, reward_b): 两个智能体的得分
         """
-        if action_a == "beat" and action_b == "beat":
-            # 双方都选择beat
-            return self.config.llost, self.config.llost
-        elif action_a == "still" and action_b == "still":
-            # 双方都选择still
-            return self.config.wwin, self.config.wwin
-        elif action_a == "beat" and action_b == "still":
-            # A选择beat，B选择still
-            return self.config.beat, self.config.beaten
-        else:  # action_a == "still" and action_b == "beat"
-            # A选择still，B选择beat
-            return self.config.beaten, self.config.beat
\ No newline at end of file
+        return self.reward[action_a][action_b], self.reward[action_b][action_a]
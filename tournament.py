@@ -1,17 +1,63 @@
 import os
 import logging
+import random
 import time
-from typing import List, Dict, Any, Tuple
+from itertools import combinations
+from multiprocessing import Pool
+from typing import List, Dict, Any, Tuple, Optional
 from datetime import datetime
 
 from config import GameConfig
 from agent import Agent
-from match import Match
+from match import Match, MatchResult
+
+
+# 当前进程复用的对抗处理器，由_init_worker创建（Match除配置外无状态）
+_match: Optional[Match] = None
+
+
+def play_match(match: Match, agent_a: Agent, agent_b: Agent, seed: int) -> MatchResult:
+    """
+    运行一对智能体之间的全部对抗（模块级函数，可在工作进程中调用）
+    
+    参数:
+        match: 对抗处理器
+        agent_a: 第一个智能体（工作进程中为经pickle传入的副本）
+        agent_b: 第二个智能体
+        seed: 本对智能体使用的随机种子（会重置当前进程的全局随机数生成器）
+        
+    返回:
+        包含所有对抗结果的MatchResult对象
+    """
+    random.seed(seed)
+    return match.run(agent_a, agent_b)
+
+
+def _run_pair(task: Tuple) -> Tuple[int, MatchResult]:
+    """工作进程入口: 运行一组对抗并连同其序号返回，以便乱序完成后归位"""
+    index, *args = task
+    return index, play_match(_match, *args)
+
+
+def _init_worker(config: GameConfig, quiet: bool = True):
+    """
+    进程初始化: 创建本进程复用的Match
+    
+    参数:
+        config: 游戏配置
+        quiet: 是否只保留对抗过程中的警告及以上日志（工作进程中避免大量逐回合日志）
+    """
+    global _match
+    _match = Match(config)
+    if quiet:
+        logging.getLogger('Match').setLevel(logging.WARNING)
+
 
 class Tournament:
     """大比赛组织类，负责组织全部对抗并计算最终排名"""
     
-    def __init__(self, config: GameConfig, agents: List[Agent], log_path: str):
+    def __init__(self, config: GameConfig, agents: List[Agent], log_path: str,
+                 workers: Optional[int] = None):
         """
         初始化大比赛
         
@@ -19,11 +65,15 @@ class Tournament:
             config: 游戏配置
             agents: 参与比赛的智能体列表
             log_path: 日志文件路径
+            workers: 并行对抗的进程数（默认使用全部CPU核心，为1时在当前进程内运行）
         """
         self.config = config
         self.agents = agents
         self.log_path = log_path
+        self.workers = workers if workers else (os.cpu_count() or 1)
         self.logger = self._init_logger(log_path)
+        # 得分矩阵: results_matrix[i][j] 为第i个智能体对第j个智能体的得分，由run填充
+        self.results_matrix: List[List[float]] = []
         
         # 验证智能体
         self._validate_agents()
@@ -84,26 +134,41 @@ class Tournament:
         self.logger.info(f"参赛智能体: {[agent.name for agent in self.agents]}")
         
         start_time = time.time()
-        scores = {agent.name: {} for agent in self.agents}
-        agent_lookup = {agent.name: agent for agent in self.agents}
-        
-        # 两两对抗
-        total_matches = len(self.agents) * (len(self.agents) - 1) // 2
+        num_agents = len(self.agents)
+        matrix = [[0] * num_agents for _ in range(num_agents)]  # 对角线（自对抗）保持为0
+        self.results_matrix = matrix
+        
+        # 两两对抗（只取上三角配对，避免重复和自对抗），
+        # 每对智能体使用独立的随机种子，保证串行与并行结果一致
+        pairs = [(i, j, random.getrandbits(64)) for i, j in combinations(range(num_agents), 2)]
+        total_matches = len(pairs)
         completed = 0
         
-        for i, agent_a in enumerate(self.agents):
-            for j, agent_b in enumerate(self.agents):
-                if i >= j:  # 避免重复和自对抗
-                    continue
-                    
-                self.logger.info(f"对抗 {agent_a.name} vs {agent_b.name} 开始")
-                match = Match(self.config)
-                result = match.run(agent_a, agent_b)
-                
-                # 记录最低得分（根据规则5）
+        # 智能体实例直接传给工作进程（内置智能体均可pickle），保留其构造参数和之后修改的设置
+        agents = self.agents
+        tasks = [(index, agents[i], agents[j], seed) for index, (i, j, seed) in enumerate(pairs)]
+        self.logger.info(f"共 {total_matches} 组对抗，使用 {self.workers} 个进程")
+        if self.workers > 1:
+            # 耗时长的配对先派发（双方都是确定性策略的配对只需运行一场，放在最后），
+            # 并逐个派发任务，使比赛末尾各进程的负载尽量均衡
+            tasks.sort(key=lambda task: task[1].deterministic and task[2].deterministic)
+            pool = Pool(self.workers, initializer=_init_worker, initargs=(self.config,))
+            results = pool.imap_unordered(_run_pair, tasks)
+        else:
+            pool = None
+            _init_worker(self.config, quiet=False)
+            results = map(_run_pair, tasks)
+        # 串行时各配对在当前进程内重新设定随机种子，结束后恢复调用方的随机数状态
+        caller_rng_state = random.getstate()
+        
+        try:
+            for index, result in results:
+                i, j, _ = pairs[index]
+                agent_a, agent_b = agents[i], agents[j]
+                # 记录最低得分（根据规则5），按下标写入矩阵，与完成顺序无关
                 score_a, score_b = result.get_025_scores()
-                scores[agent_a.name][agent_b.name] = score_a
-                scores[agent_b.name][agent_a.name] = score_b
+                matrix[i][j] = score_a
+                matrix[j][i] = score_b
                   # 写入日志
                 self.logger.info(f"{agent_a.name} vs {agent_b.name}:")
                 self.logger.info(f"  25分位数: {agent_a.name}={score_a}, {agent_b.name}={score_b}")
@@ -112,19 +177,13 @@ class Tournament:
                 
                 completed += 1
                 self.logger.info(f"已完成: {completed}/{total_matches} ({completed/total_matches*100:.1f}%)")
+        finally:
+            if pool is not None:
+                pool.terminate()  # 正常结束时结果已全部取回；出错时不再等待剩余任务
+            random.setstate(caller_rng_state)
         
-        # 计算每个智能体的平均得分
-        final_scores = {}
-        for agent_name in scores:
-            # 计算与所有其他对手的平均得分
-            opponent_scores = list(scores[agent_name].values())
-            if opponent_scores:
-                final_scores[agent_name] = sum(opponent_scores) / len(opponent_scores)
-            else:
-                final_scores[agent_name] = 0
-        
-        # 生成排名
-        ranked = [(agent_lookup[name], score) for name, score in final_scores.items()]
+        # 计算每个智能体与所有其他对手的平均得分（对角线为0，不影响行和），并生成排名
+        ranked = [(agent, sum(row) / (num_agents - 1)) for agent, row in zip(agents, matrix)]
         ranked.sort(key=lambda x: x[1], reverse=True)
         
         # 记录最终排名